@@ -1,20 +1,20 @@
 """图片生成器工厂"""
-from typing import Dict, Any
+import importlib
+from typing import Dict, Any, Union
 from .base import ImageGeneratorBase
-from .google_genai import GoogleGenAIGenerator
-from .openai_compatible import OpenAICompatibleGenerator
-from .image_api import ImageApiGenerator
 
 
 class ImageGeneratorFactory:
     """图片生成器工厂类"""
 
     # 注册的生成器类型
-    GENERATORS = {
-        'google_genai': GoogleGenAIGenerator,
-        'openai': OpenAICompatibleGenerator,
-        'openai_compatible': OpenAICompatibleGenerator,
-        'image_api': ImageApiGenerator,
+    # 内置生成器以 "模块:类名" 登记，首次创建时才导入，
+    # 避免未使用的服务商 SDK（如 google-genai）拖慢启动
+    GENERATORS: Dict[str, Union[str, type]] = {
+        'google_genai': '.google_genai:GoogleGenAIGenerator',
+        'openai': '.openai_compatible:OpenAICompatibleGenerator',
+        'openai_compatible': '.openai_compatible:OpenAICompatibleGenerator',
+        'image_api': '.image_api:ImageApiGenerator',
     }
 
     @classmethod
@@ -43,9 +43,28 @@ class ImageGeneratorFactory:
                 "3. 或使用环境变量 IMAGE_PROVIDER 指定服务商"
             )
 
-        generator_class = cls.GENERATORS[provider]
+        generator_class = cls._resolve_generator(provider)
         return generator_class(config)
 
+    @classmethod
+    def _resolve_generator(cls, provider: str) -> type:
+        """
+        获取生成器类，按需导入尚未加载的内置生成器
+
+        Args:
+            provider: 服务商类型
+
+        Returns:
+            生成器类
+        """
+        generator_class = cls.GENERATORS[provider]
+        if isinstance(generator_class, str):
+            module_name, class_name = generator_class.split(':')
+            module = importlib.import_module(module_name, __package__)
+            generator_class = getattr(module, class_name)
+            cls.GENERATORS[provider] = generator_class
+        return generator_class
+
     @classmethod
     def register_generator(cls, name: str, generator_class: type):
         """
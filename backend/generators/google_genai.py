@@ -279,6 +279,9 @@ def parse_genai_error(error: Exception) -> str:
 class GoogleGenAIGenerator(ImageGeneratorBase):
     """Google GenAI 图片生成器"""
 
+    # 支持的宽高比
+    SUPPORTED_ASPECT_RATIOS = ("1:1", "3:4", "4:3", "16:9", "9:16")
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         logger.debug("初始化 GoogleGenAIGenerator...")
@@ -445,4 +448,4 @@ class GoogleGenAIGenerator(ImageGeneratorBase):
 
     def get_supported_aspect_ratios(self) -> list:
         """获取支持的宽高比"""
-        return ["1:1", "3:4", "4:3", "16:9", "9:16"]
+        return list(self.SUPPORTED_ASPECT_RATIOS)
@@ -1,17 +1,30 @@
 """Image API 图片生成器"""
 import logging
 import base64
-import requests
+import re
 from typing import Dict, Any, Optional, List, Union
 from .base import ImageGeneratorBase
 from ..utils.image_compressor import compress_image
+from ..utils.http_session import CONNECT_TIMEOUT, create_session, download_image, post_with_retry_after
+from ..utils.json_codec import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
 
+# Markdown 图片链接: ![xxx](url)
+MARKDOWN_IMAGE_URL_PATTERN = re.compile(r'!\[.*?\]\((https?://[^\s\)]+)\)')
+# Markdown 图片 Base64: ![xxx](data:image/...)
+MARKDOWN_IMAGE_BASE64_PATTERN = re.compile(r'!\[.*?\]\((data:image\/[^;]+;base64,[^\s\)]+)\)')
+
+
 class ImageApiGenerator(ImageGeneratorBase):
     """Image API 生成器"""
 
+    # 支持的图片尺寸
+    SUPPORTED_SIZES = ("1K", "2K", "4K")
+    # 支持的宽高比
+    SUPPORTED_ASPECT_RATIOS = ("1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9")
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         logger.debug("初始化 ImageApiGenerator...")
@@ -34,6 +47,17 @@ class ImageApiGenerator(ImageGeneratorBase):
             endpoint_type = '/' + endpoint_type
         self.endpoint_type = endpoint_type
 
+        # 预先计算请求地址和接口类型，避免每次生成时重复拼接判断
+        self.api_url = f"{self.base_url}{self.endpoint_type}"
+        self.use_chat_api = 'chat' in self.endpoint_type or 'completions' in self.endpoint_type
+
+        self.session = create_session()
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
         logger.info(f"ImageApiGenerator 初始化完成: base_url={self.base_url}, model={self.model}, endpoint={self.endpoint_type}")
 
     def validate_config(self) -> bool:
@@ -48,11 +72,11 @@ class ImageApiGenerator(ImageGeneratorBase):
 
     def get_supported_sizes(self) -> List[str]:
         """获取支持的图片尺寸"""
-        return ["1K", "2K", "4K"]
+        return list(self.SUPPORTED_SIZES)
 
     def get_supported_aspect_ratios(self) -> List[str]:
         """获取支持的宽高比"""
-        return ["1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9"]
+        return list(self.SUPPORTED_ASPECT_RATIOS)
 
     def generate_image(
         self,
@@ -89,7 +113,7 @@ class ImageApiGenerator(ImageGeneratorBase):
         logger.info(f"Image API 生成图片: model={model}, aspect_ratio={aspect_ratio}, endpoint={self.endpoint_type}")
 
         # 根据端点类型选择不同的生成方式
-        if 'chat' in self.endpoint_type or 'completions' in self.endpoint_type:
+        if self.use_chat_api:
             return self._generate_via_chat_api(prompt, aspect_ratio, model, reference_image, reference_images)
         else:
             return self._generate_via_images_api(prompt, aspect_ratio, model, reference_image, reference_images)
@@ -103,11 +127,6 @@ class ImageApiGenerator(ImageGeneratorBase):
         reference_images: Optional[List[bytes]] = None
     ) -> bytes:
         """通过 /v1/images/generations 端点生成图片"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "prompt": prompt,
@@ -148,9 +167,9 @@ class ImageApiGenerator(ImageGeneratorBase):
 4. 如果参考图中有人物或产品，可以适当融入"""
             payload["prompt"] = enhanced_prompt
 
-        api_url = f"{self.base_url}{self.endpoint_type}"
+        api_url = self.api_url
         logger.debug(f"  发送请求到: {api_url}")
-        response = requests.post(api_url, headers=headers, json=payload, timeout=300)
+        response = post_with_retry_after(self.session, api_url, headers=self.headers, data=json_dumps(payload), timeout=(CONNECT_TIMEOUT, 300))
 
         if response.status_code != 200:
             error_detail = response.text[:500]
@@ -167,7 +186,7 @@ class ImageApiGenerator(ImageGeneratorBase):
                 "建议：检查API密钥和base_url配置"
             )
 
-        result = response.json()
+        result = json_loads(response.content)
         logger.debug(f"  API 响应: data 长度={len(result.get('data', []))}")
 
         if "data" in result and len(result["data"]) > 0:
@@ -203,13 +222,6 @@ class ImageApiGenerator(ImageGeneratorBase):
         reference_images: Optional[List[bytes]] = None
     ) -> bytes:
         """通过 /v1/chat/completions 端点生成图片（如即梦 API）"""
-        import re
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         # 构建用户消息内容
         user_content: Any = prompt
 
@@ -243,10 +255,10 @@ class ImageApiGenerator(ImageGeneratorBase):
             "temperature": 1.0
         }
 
-        api_url = f"{self.base_url}{self.endpoint_type}"
+        api_url = self.api_url
         logger.info(f"Chat API 生成图片: {api_url}, model={model}")
 
-        response = requests.post(api_url, headers=headers, json=payload, timeout=300)
+        response = post_with_retry_after(self.session, api_url, headers=self.headers, data=json_dumps(payload), timeout=(CONNECT_TIMEOUT, 300))
 
         if response.status_code != 200:
             error_detail = response.text[:500]
@@ -276,7 +288,7 @@ class ImageApiGenerator(ImageGeneratorBase):
                     f"【模型】{model}"
                 )
 
-        result = response.json()
+        result = json_loads(response.content)
         logger.debug(f"Chat API 响应: {str(result)[:500]}")
 
         # 解析响应
@@ -287,15 +299,13 @@ class ImageApiGenerator(ImageGeneratorBase):
 
                 if isinstance(content, str):
                     # Markdown 图片链接: ![xxx](url)
-                    pattern = r'!\[.*?\]\((https?://[^\s\)]+)\)'
-                    urls = re.findall(pattern, content)
+                    urls = MARKDOWN_IMAGE_URL_PATTERN.findall(content)
                     if urls:
                         logger.info(f"从 Markdown 提取到 {len(urls)} 张图片，下载第一张...")
-                        return self._download_image(urls[0])
+                        return download_image(self.session, urls[0])
 
                     # Markdown 图片 Base64: ![xxx](data:image/...)
-                    base64_pattern = r'!\[.*?\]\((data:image\/[^;]+;base64,[^\s\)]+)\)'
-                    base64_urls = re.findall(base64_pattern, content)
+                    base64_urls = MARKDOWN_IMAGE_BASE64_PATTERN.findall(content)
                     if base64_urls:
                         logger.info("从 Markdown 提取到 Base64 图片数据")
                         base64_data = base64_urls[0].split(",")[1]
@@ -310,7 +320,7 @@ class ImageApiGenerator(ImageGeneratorBase):
                     # 纯 URL
                     if content.startswith("http://") or content.startswith("https://"):
                         logger.info("检测到图片 URL")
-                        return self._download_image(content.strip())
+                        return download_image(self.session, content.strip())
 
         raise Exception(
             "❌ 无法从 Chat API 响应中提取图片数据\n\n"
@@ -323,18 +333,3 @@ class ImageApiGenerator(ImageGeneratorBase):
             "1. 确认模型名称正确\n"
             "2. 修改提示词后重试"
         )
-
-    def _download_image(self, url: str) -> bytes:
-        """下载图片并返回二进制数据"""
-        logger.info(f"下载图片: {url[:100]}...")
-        try:
-            response = requests.get(url, timeout=60)
-            if response.status_code == 200:
-                logger.info(f"✅ 图片下载成功: {len(response.content)} bytes")
-                return response.content
-            else:
-                raise Exception(f"下载图片失败: HTTP {response.status_code}")
-        except requests.exceptions.Timeout:
-            raise Exception("❌ 下载图片超时，请重试")
-        except Exception as e:
-            raise Exception(f"❌ 下载图片失败: {str(e)}")
@@ -1,16 +1,31 @@
 """OpenAI 兼容接口图片生成器"""
 import logging
 import base64
+import re
 from typing import Dict, Any
-import requests
 from .base import ImageGeneratorBase
+from ..utils.http_session import CONNECT_TIMEOUT, create_session, download_image, post_with_retry_after
+from ..utils.json_codec import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
 
+# 匹配 ![任意文字](url) 格式
+MARKDOWN_IMAGE_URL_PATTERN = re.compile(r'!\[.*?\]\((https?://[^\s\)]+)\)')
+
+
 class OpenAICompatibleGenerator(ImageGeneratorBase):
     """OpenAI 兼容接口图片生成器"""
 
+    # 默认OpenAI支持的尺寸
+    DEFAULT_SUPPORTED_SIZES = (
+        "1024x1024",
+        "1792x1024",
+        "1024x1792",
+        "2048x2048",
+        "4096x4096"
+    )
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         logger.debug("初始化 OpenAICompatibleGenerator...")
@@ -44,8 +59,21 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
             endpoint_type = '/v1/images/generations'
         elif endpoint_type == 'chat':
             endpoint_type = '/v1/chat/completions'
+        # 确保端点以 / 开头
+        if not endpoint_type.startswith('/'):
+            endpoint_type = '/' + endpoint_type
         self.endpoint_type = endpoint_type
 
+        self.api_url = f"{self.base_url}{self.endpoint_type}"
+        self.use_chat_api = 'chat' in self.endpoint_type or 'completions' in self.endpoint_type
+
+        self.session = create_session()
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
         logger.info(f"OpenAICompatibleGenerator 初始化完成: base_url={self.base_url}, model={self.default_model}, endpoint={self.endpoint_type}")
 
     def validate_config(self) -> bool:
@@ -79,7 +107,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
         logger.info(f"OpenAI 兼容 API 生成图片: model={model}, size={size}, endpoint={self.endpoint_type}")
 
         # 根据端点路径决定使用哪种 API 方式
-        if 'chat' in self.endpoint_type or 'completions' in self.endpoint_type:
+        if self.use_chat_api:
             return self._generate_via_chat_api(prompt, size, model)
         else:
             # 默认使用 images API
@@ -93,16 +121,9 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
         quality: str
     ) -> bytes:
         """通过 images API 端点生成"""
-        # 确保端点以 / 开头
-        endpoint = self.endpoint_type if self.endpoint_type.startswith('/') else '/' + self.endpoint_type
-        url = f"{self.base_url}{endpoint}"
+        url = self.api_url
         logger.debug(f"  发送请求到: {url}")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "prompt": prompt,
@@ -115,7 +136,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
         if quality and model.startswith('dall-e'):
             payload["quality"] = quality
 
-        response = requests.post(url, headers=headers, json=payload, timeout=300)
+        response = post_with_retry_after(self.session, url, headers=self.headers, data=json_dumps(payload), timeout=(CONNECT_TIMEOUT, 300))
 
         if response.status_code != 200:
             error_detail = response.text[:500]
@@ -134,7 +155,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
                 "建议：检查API密钥、base_url和模型名称配置"
             )
 
-        result = response.json()
+        result = json_loads(response.content)
         logger.debug(f"  API 响应: data 长度={len(result.get('data', []))}")
 
         if "data" not in result or len(result["data"]) == 0:
@@ -160,13 +181,9 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
         # 处理URL格式
         elif "url" in image_data:
             logger.debug(f"  下载图片 URL...")
-            img_response = requests.get(image_data["url"], timeout=60)
-            if img_response.status_code == 200:
-                logger.info(f"✅ OpenAI Images API 图片生成成功: {len(img_response.content)} bytes")
-                return img_response.content
-            else:
-                logger.error(f"下载图片失败: {img_response.status_code}")
-                raise Exception(f"下载图片失败: {img_response.status_code}")
+            img_bytes = download_image(self.session, image_data["url"])
+            logger.info(f"✅ OpenAI Images API 图片生成成功: {len(img_bytes)} bytes")
+            return img_bytes
 
         else:
             logger.error(f"无法从响应中提取图片数据: {str(image_data)[:200]}")
@@ -193,16 +210,9 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
         2. Base64 data URL: data:image/xxx;base64,xxx
         3. 纯图片 URL
         """
-        # 确保端点以 / 开头
-        endpoint = self.endpoint_type if self.endpoint_type.startswith('/') else '/' + self.endpoint_type
-        url = f"{self.base_url}{endpoint}"
+        url = self.api_url
         logger.info(f"Chat API 生成图片: {url}, model={model}")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "messages": [
@@ -215,7 +225,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
             "temperature": 1.0
         }
 
-        response = requests.post(url, headers=headers, json=payload, timeout=300)
+        response = post_with_retry_after(self.session, url, headers=self.headers, data=json_dumps(payload), timeout=(CONNECT_TIMEOUT, 300))
 
         if response.status_code != 200:
             error_detail = response.text[:500]
@@ -246,7 +256,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
                     f"【模型】{model}"
                 )
 
-        result = response.json()
+        result = json_loads(response.content)
         logger.debug(f"Chat API 响应: {str(result)[:500]}")
 
         # 解析响应
@@ -261,7 +271,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
                     if image_urls:
                         # 下载第一张图片
                         logger.info(f"从 Markdown 提取到 {len(image_urls)} 张图片，下载第一张...")
-                        return self._download_image(image_urls[0])
+                        return download_image(self.session, image_urls[0])
 
                     # 2. 尝试解析 Base64 data URL
                     if content.startswith("data:image"):
@@ -272,7 +282,7 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
                     # 3. 尝试作为纯 URL 处理
                     if content.startswith("http://") or content.startswith("https://"):
                         logger.info("检测到图片 URL")
-                        return self._download_image(content.strip())
+                        return download_image(self.session, content.strip())
 
         raise ValueError(
             "❌ 无法从 Chat API 响应中提取图片数据\n\n"
@@ -292,35 +302,10 @@ class OpenAICompatibleGenerator(ImageGeneratorBase):
 
         支持格式: ![alt text](url) 或 ![](url)
         """
-        import re
-        # 匹配 ![任意文字](url) 格式
-        pattern = r'!\[.*?\]\((https?://[^\s\)]+)\)'
-        urls = re.findall(pattern, content)
+        urls = MARKDOWN_IMAGE_URL_PATTERN.findall(content)
         logger.debug(f"从 Markdown 提取到 {len(urls)} 个图片 URL")
         return urls
 
-    def _download_image(self, url: str) -> bytes:
-        """下载图片并返回二进制数据"""
-        logger.info(f"下载图片: {url[:100]}...")
-        try:
-            response = requests.get(url, timeout=60)
-            if response.status_code == 200:
-                logger.info(f"✅ 图片下载成功: {len(response.content)} bytes")
-                return response.content
-            else:
-                raise Exception(f"下载图片失败: HTTP {response.status_code}")
-        except requests.exceptions.Timeout:
-            raise Exception("❌ 下载图片超时，请重试")
-        except Exception as e:
-            raise Exception(f"❌ 下载图片失败: {str(e)}")
-
     def get_supported_sizes(self) -> list:
         """获取支持的图片尺寸"""
-        # 默认OpenAI支持的尺寸
-        return self.config.get('supported_sizes', [
-            "1024x1024",
-            "1792x1024",
-            "1024x1792",
-            "2048x2048",
-            "4096x4096"
-        ])
+        return self.config.get('supported_sizes', list(self.DEFAULT_SUPPORTED_SIZES))
@@ -0,0 +1,168 @@
+"""HTTP 会话工具"""
+import logging
+import math
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# 服务端 Retry-After 的最大等待时间（秒），超过则按上限等待
+MAX_RETRY_AFTER = 60
+
+# 建立连接的超时时间（秒），与读取超时分开设置，避免连不上时等满整个读取超时
+CONNECT_TIMEOUT = 10
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 响应头的值，可以是秒数或 HTTP 日期
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # nan/inf 无法用于 time.sleep，视为无效
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    # 时区为 -0000 的日期解析结果不带时区信息，按 UTC 处理
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CappedRetry(Retry):
+    """等待时间不超过 MAX_RETRY_AFTER 的重试策略"""
+
+    def get_retry_after(self, response):
+        """获取 Retry-After 等待秒数，避免服务端返回过长时间阻塞工作线程"""
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+def create_session(
+    pool_connections: int = 4,
+    pool_maxsize: int = 16,
+    retries: bool = True
+) -> requests.Session:
+    """
+    创建带连接池和重试策略的 HTTP 会话
+
+    复用同一个会话可以保持 keep-alive 连接，避免每次请求都重新进行 TCP/TLS 握手。
+    读取失败和状态码重试只对 GET 等幂等请求生效，图片生成的 POST 请求不会被重复提交；
+    连接失败时请求尚未发出，所有请求最多再重连一次。
+    不要在会话上设置 Authorization 请求头：同一会话也用于下载第三方图片地址，应按请求传入。
+
+    Args:
+        pool_connections: 缓存的连接池数量（按主机区分）
+        pool_maxsize: 每个连接池的最大连接数，应不小于图片并发生成数
+        retries: 是否启用连接层重试；调用方自行负责重试时应关闭，避免两层重试叠加
+
+    Returns:
+        配置好的 requests.Session 实例
+    """
+    retry = CappedRetry(
+        total=3,
+        # 连接失败只重试一次，配合 CONNECT_TIMEOUT 限制最坏等待时间
+        connect=1,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # 429/503 时优先按服务端 Retry-After 等待（最多 MAX_RETRY_AFTER 秒）
+        respect_retry_after_header=True,
+        # 重试耗尽后返回最后一次响应，由调用方按状态码给出错误提示
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry if retries else 0,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def download_image(session: requests.Session, url: str, timeout: float = 60) -> bytes:
+    """
+    下载图片并返回二进制数据
+
+    Args:
+        session: HTTP 会话
+        url: 图片地址
+        timeout: 读取超时时间（秒）
+
+    Returns:
+        图片二进制数据
+    """
+    logger.info(f"下载图片: {url[:100]}...")
+    try:
+        with session.get(url, timeout=(CONNECT_TIMEOUT, timeout), stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"下载图片失败: HTTP {response.status_code}")
+            # 直接从连接一次性读取响应体，避免分块累积后再拼接的额外拷贝
+            response.raw.decode_content = True
+            image_data = response.raw.read()
+        logger.info(f"✅ 图片下载成功: {len(image_data)} bytes")
+        return image_data
+    except (requests.exceptions.Timeout, ReadTimeoutError):
+        raise Exception("❌ 下载图片超时，请重试")
+    except Exception as e:
+        raise Exception(f"❌ 下载图片失败: {str(e)}")
+
+
+def post_with_retry_after(
+    session: requests.Session,
+    url: str,
+    max_retries: int = 3,
+    **kwargs
+) -> requests.Response:
+    """
+    发送 POST 请求，遇到 429 限流时按 Retry-After 等待后重新提交
+
+    429 表示服务端未处理该请求，重新提交不会重复生成；
+    等待时间不超过 MAX_RETRY_AFTER，无 Retry-After 时按指数退避
+
+    Args:
+        session: HTTP 会话
+        url: 请求地址
+        max_retries: 最大尝试次数
+        **kwargs: 传给 session.post 的其他参数
+
+    Returns:
+        最后一次请求的响应（重试耗尽时仍可能是 429，由调用方给出错误提示）
+    """
+    for attempt in range(max_retries):
+        response = session.post(url, **kwargs)
+        if response.status_code != 429 or attempt >= max_retries - 1:
+            return response
+
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            wait_time = min(retry_after, MAX_RETRY_AFTER)
+        else:
+            wait_time = (2 ** attempt) + random.uniform(0, 1)
+        logger.warning(f"遇到限流，{wait_time:.1f}秒后重试 (尝试 {attempt + 2}/{max_retries})")
+        response.close()
+        time.sleep(wait_time)
@@ -6,10 +6,56 @@ import requests
 from functools import wraps
 from typing import List, Optional, Union
 from .image_compressor import compress_image
+from .http_session import CONNECT_TIMEOUT, MAX_RETRY_AFTER, create_session, parse_retry_after
+
+
+# 可重试的 4xx 状态码（请求超时、过早请求、限流），其余 4xx 直接失败
+RETRYABLE_CLIENT_STATUS_CODES = {408, 425, 429}
+
+
+class TextAPIError(Exception):
+    """Text API 请求错误（携带 HTTP 状态码）"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitError(TextAPIError):
+    """API 限流错误（携带服务端建议的重试等待时间）"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    判断错误是否为可重试的临时错误
+
+    连接错误、5xx 和 408/425/429 可重试；认证、权限、参数等其余错误重试无意义，直接失败。
+    读超时不重试：请求可能已在服务端完成生成，重新提交会重复计费并成倍增加等待时间
+
+    Args:
+        error: 捕获到的异常
+
+    Returns:
+        是否可重试
+    """
+    # 证书和代理配置错误虽然是 ConnectionError 的子类，但重试无法恢复
+    if isinstance(error, (requests.exceptions.SSLError, requests.exceptions.ProxyError)):
+        return False
+    # ConnectTimeout 是 ConnectionError 的子类，ReadTimeout 不是
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return True
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        return False
+    return status_code >= 500 or status_code in RETRYABLE_CLIENT_STATUS_CODES
 
 
 def retry_on_429(max_retries=3, base_delay=2):
-    """429 错误自动重试装饰器"""
+    """临时错误自动重试装饰器（限流时优先遵循服务端的 Retry-After）"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -17,26 +63,36 @@ def retry_on_429(max_retries=3, base_delay=2):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    error_str = str(e)
-                    if "429" in error_str or "rate" in error_str.lower():
-                        if attempt < max_retries - 1:
+                    # 不可重试的错误直接抛出，避免在无法恢复的错误上浪费时间
+                    if not is_retryable_error(e) or attempt >= max_retries - 1:
+                        raise
+                    if isinstance(e, RateLimitError):
+                        if e.retry_after is not None:
+                            wait_time = min(e.retry_after, MAX_RETRY_AFTER)
+                        else:
                             wait_time = (base_delay ** attempt) + random.uniform(0, 1)
-                            print(f"[重试] 遇到限流，{wait_time:.1f}秒后重试 (尝试 {attempt + 2}/{max_retries})")
-                            time.sleep(wait_time)
-                            continue
-                    raise
-            raise Exception(
-                f"Text API 重试 {max_retries} 次后仍失败。\n"
-                "可能原因：\n"
-                "1. API持续限流或配额不足\n"
-                "2. 网络连接持续不稳定\n"
-                "3. API服务暂时不可用\n"
-                "建议：稍后再试，或联系API服务提供商"
-            )
+                        print(f"[重试] 遇到限流，{wait_time:.1f}秒后重试 (尝试 {attempt + 2}/{max_retries})")
+                    else:
+                        wait_time = min(2 ** attempt, 10) + random.uniform(0, 1)
+                        print(f"[重试] 请求失败，{wait_time:.1f}秒后重试 (尝试 {attempt + 2}/{max_retries})")
+                    time.sleep(wait_time)
         return wrapper
     return decorator
 
 
+# 进程内共享的 HTTP 会话
+# 大纲/内容服务每次请求都会新建客户端，共享会话才能复用 keep-alive 连接
+_session_instance = None
+
+def get_http_session() -> requests.Session:
+    """获取全局共享的 HTTP 会话"""
+    global _session_instance
+    if _session_instance is None:
+        # 重试策略完全由 retry_on_429 决定，连接层不再重试
+        _session_instance = create_session(retries=False)
+    return _session_instance
+
+
 class TextChatClient:
     """Text API 客户端封装类"""
 
@@ -59,6 +115,15 @@ class TextChatClient:
             endpoint = '/' + endpoint
         self.chat_endpoint = f"{self.base_url}{endpoint}"
 
+        self.session = get_http_session()
+
+        # 请求头只构建一次，所有请求复用
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
     def _encode_image_to_base64(self, image_data: bytes) -> str:
         """将图片数据编码为 base64"""
         return base64.b64encode(image_data).decode('utf-8')
@@ -150,17 +215,11 @@ class TextChatClient:
             "stream": False
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-
-        response = requests.post(
+        response = self.session.post(
             self.chat_endpoint,
             json=payload,
-            headers=headers,
-            timeout=300  # 5分钟超时
+            headers=self.headers,
+            timeout=(CONNECT_TIMEOUT, 300)  # 连接 10 秒、读取 5 分钟超时
         )
 
         if response.status_code != 200:
@@ -169,7 +228,7 @@ class TextChatClient:
 
             # 根据状态码给出更详细的错误信息
             if status_code == 401:
-                raise Exception(
+                raise TextAPIError(
                     "❌ API Key 认证失败\n\n"
                     "【可能原因】\n"
                     "1. API Key 无效或已过期\n"
@@ -178,10 +237,11 @@ class TextChatClient:
                     "【解决方案】\n"
                     "1. 在系统设置页面检查 API Key 是否正确\n"
                     "2. 重新获取 API Key\n"
-                    f"\n【请求地址】{self.chat_endpoint}"
+                    f"\n【请求地址】{self.chat_endpoint}",
+                    status_code=status_code
                 )
             elif status_code == 403:
-                raise Exception(
+                raise TextAPIError(
                     "❌ 权限被拒绝\n\n"
                     "【可能原因】\n"
                     "1. API Key 没有访问该模型的权限\n"
@@ -190,10 +250,11 @@ class TextChatClient:
                     "【解决方案】\n"
                     "1. 检查 API 权限配置\n"
                     "2. 尝试使用其他模型\n"
-                    f"\n【原始错误】{error_detail[:200]}"
+                    f"\n【原始错误】{error_detail[:200]}",
+                    status_code=status_code
                 )
             elif status_code == 404:
-                raise Exception(
+                raise TextAPIError(
                     "❌ 模型不存在或 API 端点错误\n\n"
                     "【可能原因】\n"
                     f"1. 模型 '{model}' 不存在或已下线\n"
@@ -201,29 +262,32 @@ class TextChatClient:
                     "【解决方案】\n"
                     "1. 检查模型名称是否正确\n"
                     "2. 检查 Base URL 配置\n"
-                    f"\n【请求地址】{self.chat_endpoint}"
+                    f"\n【请求地址】{self.chat_endpoint}",
+                    status_code=status_code
                 )
             elif status_code == 429:
-                raise Exception(
+                raise RateLimitError(
                     "⏳ API 配额或速率限制\n\n"
                     "【说明】\n"
                     "请求频率过高或配额已用尽。\n\n"
                     "【解决方案】\n"
                     "1. 稍后再试（等待 1-2 分钟）\n"
                     "2. 检查 API 配额使用情况\n"
-                    "3. 考虑升级计划获取更多配额"
+                    "3. 考虑升级计划获取更多配额",
+                    retry_after=parse_retry_after(response.headers.get('Retry-After'))
                 )
             elif status_code >= 500:
-                raise Exception(
+                raise TextAPIError(
                     f"⚠️ API 服务器错误 ({status_code})\n\n"
                     "【说明】\n"
                     "这是服务端的临时故障，与您的配置无关。\n\n"
                     "【解决方案】\n"
                     "1. 稍等几分钟后重试\n"
-                    "2. 如果持续出现，检查服务商状态页"
+                    "2. 如果持续出现，检查服务商状态页",
+                    status_code=status_code
                 )
             else:
-                raise Exception(
+                raise TextAPIError(
                     f"❌ API 请求失败 (状态码: {status_code})\n\n"
                     f"【原始错误】\n{error_detail}\n\n"
                     f"【请求地址】{self.chat_endpoint}\n"
@@ -231,7 +295,8 @@ class TextChatClient:
                     "【通用解决方案】\n"
                     "1. 检查 API Key 是否正确\n"
                     "2. 检查 Base URL 配置\n"
-                    "3. 检查模型名称是否正确"
+                    "3. 检查模型名称是否正确",
+                    status_code=status_code
                 )
 
         result = response.json()
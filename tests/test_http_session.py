@@ -0,0 +1,205 @@
+"""
+HTTP 会话工具测试
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+from urllib3 import HTTPResponse
+
+from backend.utils import http_session
+from backend.utils.http_session import (
+    CONNECT_TIMEOUT,
+    MAX_RETRY_AFTER,
+    create_session,
+    download_image,
+    parse_retry_after,
+    post_with_retry_after,
+)
+
+
+def _retry_policy():
+    session = create_session()
+    return session.get_adapter('https://example.com').max_retries
+
+
+class TestCreateSession:
+    """create_session 重试策略测试"""
+
+    def test_retry_after_is_capped(self):
+        response = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+        assert _retry_policy().get_retry_after(response) == MAX_RETRY_AFTER
+
+    def test_short_retry_after_is_kept(self):
+        response = HTTPResponse(status=503, headers={'Retry-After': '2'})
+        assert _retry_policy().get_retry_after(response) == 2
+
+    def test_missing_retry_after(self):
+        response = HTTPResponse(status=503)
+        assert _retry_policy().get_retry_after(response) is None
+
+    def test_cap_survives_retry_increment(self):
+        retry = _retry_policy().new(total=2)
+        response = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+        assert retry.get_retry_after(response) == MAX_RETRY_AFTER
+
+    def test_retries_disabled(self):
+        session = create_session(retries=False)
+        retry = session.get_adapter('https://example.com').max_retries
+        assert retry.total == 0
+
+
+class TestParseRetryAfter:
+    """Retry-After 响应头解析测试"""
+
+    def test_seconds(self):
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after("-3") == 0.0
+
+    def test_missing(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("") is None
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        seconds = parse_retry_after(format_datetime(retry_at, usegmt=True))
+        assert 25 <= seconds <= 30
+
+    def test_http_date_in_past(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_http_date_with_unknown_zone(self):
+        # -0000 时区会被解析为不带时区信息的 datetime
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 -0000") == 0.0
+
+    def test_garbage(self):
+        assert parse_retry_after("soon") is None
+
+    def test_non_finite(self):
+        assert parse_retry_after("nan") is None
+        assert parse_retry_after("inf") is None
+
+
+class _FakeResponse:
+    """只包含状态码和响应头的假响应"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class _FakeSession:
+    """按顺序返回预设响应的假会话"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.responses[len(self.calls) - 1]
+
+
+class TestPostWithRetryAfter:
+    """生成请求的限流重试测试"""
+
+    @pytest.fixture(autouse=True)
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(http_session.time, 'sleep', sleeps.append)
+        return sleeps
+
+    def test_success_is_not_retried(self, sleeps):
+        session = _FakeSession(_FakeResponse(200))
+        response = post_with_retry_after(session, 'https://api.example.com', timeout=1)
+        assert response.status_code == 200
+        assert len(session.calls) == 1
+        assert session.calls[0][1] == {'timeout': 1}
+        assert sleeps == []
+
+    def test_rate_limit_honors_retry_after(self, sleeps):
+        session = _FakeSession(_FakeResponse(429, {'Retry-After': '7'}), _FakeResponse(200))
+        response = post_with_retry_after(session, 'https://api.example.com')
+        assert response.status_code == 200
+        assert len(session.calls) == 2
+        assert sleeps == [7.0]
+
+    def test_retry_after_is_capped(self, sleeps):
+        session = _FakeSession(_FakeResponse(429, {'Retry-After': '3600'}), _FakeResponse(200))
+        post_with_retry_after(session, 'https://api.example.com')
+        assert sleeps == [MAX_RETRY_AFTER]
+
+    def test_gives_up_after_max_retries(self, sleeps):
+        session = _FakeSession(*[_FakeResponse(429) for _ in range(3)])
+        response = post_with_retry_after(session, 'https://api.example.com', max_retries=3)
+        assert response.status_code == 429
+        assert len(session.calls) == 3
+        assert len(sleeps) == 2
+
+    def test_other_errors_are_not_retried(self, sleeps):
+        session = _FakeSession(_FakeResponse(500))
+        response = post_with_retry_after(session, 'https://api.example.com')
+        assert response.status_code == 500
+        assert len(session.calls) == 1
+
+
+class _FakeRaw:
+    """模拟 urllib3 原始响应流"""
+
+    def __init__(self, data):
+        self.data = data
+        self.decode_content = False
+
+    def read(self):
+        return self.data
+
+
+class _FakeDownloadResponse:
+    """支持 with 语句的假下载响应"""
+
+    def __init__(self, status_code, data=b''):
+        self.status_code = status_code
+        self.raw = _FakeRaw(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _FakeDownloadSession:
+    """返回预设下载结果或抛出预设异常的假会话"""
+
+    def __init__(self, result):
+        self.result = result
+        self.kwargs = None
+
+    def get(self, url, **kwargs):
+        self.kwargs = kwargs
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class TestDownloadImage:
+    """图片下载测试"""
+
+    def test_returns_body(self):
+        session = _FakeDownloadSession(_FakeDownloadResponse(200, b'\x89PNG'))
+        assert download_image(session, 'https://cdn.example.com/a.png', timeout=30) == b'\x89PNG'
+        assert session.kwargs == {'timeout': (CONNECT_TIMEOUT, 30), 'stream': True}
+
+    def test_http_error(self):
+        session = _FakeDownloadSession(_FakeDownloadResponse(404))
+        with pytest.raises(Exception, match='HTTP 404'):
+            download_image(session, 'https://cdn.example.com/a.png')
+
+    def test_timeout(self):
+        session = _FakeDownloadSession(requests.exceptions.ReadTimeout('read timeout'))
+        with pytest.raises(Exception, match='下载图片超时'):
+            download_image(session, 'https://cdn.example.com/a.png')
@@ -0,0 +1,40 @@
+"""
+JSON 编解码工具测试
+"""
+import json
+
+import pytest
+
+from backend.utils.json_codec import json_dumps, json_loads
+
+
+class TestJsonCodec:
+    """json_dumps / json_loads 测试"""
+
+    def test_cjk_is_not_escaped(self):
+        body = json_dumps({"prompt": "秋季穿搭指南"})
+        assert isinstance(body, bytes)
+        assert "秋季穿搭指南".encode('utf-8') in body
+        assert b"\\u" not in body
+
+    def test_round_trip(self):
+        payload = {
+            "model": "nano-banana-2",
+            "prompt": "封面：秋季穿搭指南 🍂",
+            "n": 1,
+            "image": ["data:image/png;base64,AAAA"],
+        }
+        assert json_loads(json_dumps(payload)) == payload
+
+    def test_loads_accepts_str_and_bytes(self):
+        assert json_loads('{"a": "中文"}') == {"a": "中文"}
+        assert json_loads('{"a": "中文"}'.encode('utf-8')) == {"a": "中文"}
+
+    def test_compatible_with_stdlib(self):
+        payload = {"messages": [{"role": "user", "content": "你好"}]}
+        assert json.loads(json_dumps(payload)) == payload
+        assert json_loads(json.dumps(payload)) == payload
+
+    def test_invalid_json_raises_value_error(self):
+        with pytest.raises(ValueError):
+            json_loads(b"not json")
@@ -0,0 +1,98 @@
+"""
+Text API 客户端测试
+"""
+import pytest
+import requests
+from urllib3.util import connection as urllib3_connection
+
+from backend.utils import text_client
+from backend.utils.text_client import (
+    RateLimitError,
+    TextAPIError,
+    TextChatClient,
+    retry_on_429,
+)
+
+
+class TestRetryClassification:
+    """临时/永久错误分类与重试测试"""
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        monkeypatch.setattr(text_client.time, 'sleep', lambda seconds: None)
+
+    @staticmethod
+    def _failing_call(*errors):
+        """依次抛出给定错误，全部抛完后返回 'ok'"""
+        calls = []
+
+        @retry_on_429(max_retries=3)
+        def call():
+            calls.append(1)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return 'ok'
+
+        return call, calls
+
+    @pytest.mark.parametrize('error', [
+        TextAPIError('unauthorized', status_code=401),
+        TextAPIError('forbidden', status_code=403),
+        TextAPIError('not found', status_code=404),
+        requests.exceptions.SSLError('certificate verify failed'),
+        requests.exceptions.ProxyError('cannot connect to proxy'),
+    ])
+    def test_client_errors_fail_on_first_attempt(self, error):
+        call, calls = self._failing_call(error)
+        with pytest.raises(type(error)):
+            call()
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize('error', [
+        TextAPIError('server error', status_code=500),
+        TextAPIError('bad gateway', status_code=502),
+        RateLimitError('rate limited'),
+        RateLimitError('rate limited', retry_after=1.0),
+        requests.exceptions.ConnectionError('connection reset'),
+        requests.exceptions.ConnectTimeout('connect timeout'),
+    ])
+    def test_transient_errors_are_retried(self, error):
+        call, calls = self._failing_call(error)
+        assert call() == 'ok'
+        assert len(calls) == 2
+
+    def test_read_timeout_is_not_retried(self):
+        call, calls = self._failing_call(requests.exceptions.ReadTimeout('read timeout'))
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            call()
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_retries(self):
+        errors = [TextAPIError('server error', status_code=503)] * 3
+        call, calls = self._failing_call(*errors)
+        with pytest.raises(TextAPIError):
+            call()
+        assert len(calls) == 3
+
+
+class TestRefusedConnection:
+    """连接被拒绝时的尝试次数测试"""
+
+    def test_attempts_match_retry_decorator(self, monkeypatch):
+        monkeypatch.setattr(text_client.time, 'sleep', lambda seconds: None)
+
+        attempts = []
+        create_connection = urllib3_connection.create_connection
+
+        def counting_create_connection(*args, **kwargs):
+            attempts.append(1)
+            return create_connection(*args, **kwargs)
+
+        monkeypatch.setattr(urllib3_connection, 'create_connection', counting_create_connection)
+
+        client = TextChatClient(api_key='test-key', base_url='http://127.0.0.1:1')
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.generate_text('你好')
+
+        # 只有 retry_on_429 的 3 次尝试，连接层不再叠加重试
+        assert len(attempts) == 3